@@ -0,0 +1,239 @@
+# scripts/load_test.py
+"""
+Local HTTP load test for the quote engine.
+
+Starts the FastAPI app under uvicorn (with N workers), drives a weighted mix of
+requests against it using the bundled samples, and reports throughput plus
+p50/p95/p99 latency and error rate per endpoint. Every run is saved as JSON in
+`loadtest_results/` so it can be compared against an earlier run.
+
+Usage (from the repo root):
+    python scripts/load_test.py --workers 2 --concurrency 16 --duration 30
+    python scripts/load_test.py --mix text_json=5,text_pdf=1,csv=2,image=1
+    python scripts/load_test.py --compare loadtest_results/<previous>.json
+"""
+
+import argparse, asyncio, io, json, os, random, shutil, socket, subprocess, sys, time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+from PIL import Image, ImageDraw, ImageFont
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLES_DIR = ROOT / "samples"
+RESULTS_DIR = ROOT / "loadtest_results"
+
+# --- Sample RFQs (same phrasing as the RFQs in samples/ and tests/) ---
+SAMPLE_RFQ_TEXTS = [
+    'pls quote 20mm flex conduit 600m, 40mm corr pipe 150m FRPP, and 3" heavy hex fan box cpwd 25 nos',
+    'Quotation for: 25mm CFP 4 coils; 32mm corrugated pipe FRPP 200 m; junction box 50 nos',
+    'quote for 16mm CFP 500 m and cable tie 10 packs',
+]
+
+DEFAULT_MIX = {"text_json": 6, "text_pdf": 1, "text_csv": 1, "csv": 2, "image": 1}
+
+# --- Request builders ---
+def _render_rfq_image(text: str) -> bytes:
+    """Renders an RFQ onto a white page so the OCR endpoint has something realistic to read."""
+    lines = [line.strip() for line in text.replace(";", ",").split(",") if line.strip()]
+    image = Image.new("L", (1400, 120 + 80 * len(lines)), color=255)
+    draw = ImageDraw.Draw(image)
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 40)
+    except OSError:
+        font = ImageFont.load_default()
+    for i, line in enumerate(lines):
+        draw.text((60, 60 + 80 * i), line, fill=0, font=font)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def build_scenarios() -> Dict[str, dict]:
+    csv_bytes = (SAMPLES_DIR / "RFQ_sample.csv").read_bytes()
+    image_bytes = _render_rfq_image(SAMPLE_RFQ_TEXTS[0])
+    return {
+        "text_json": {"endpoint": "/generate-quote", "params": {"response_format": "json"}},
+        "text_pdf": {"endpoint": "/generate-quote", "params": {"response_format": "pdf"}},
+        "text_csv": {"endpoint": "/generate-quote", "params": {"response_format": "csv"}},
+        "csv": {"endpoint": "/process-rfq-csv", "files": {"file": ("RFQ_sample.csv", csv_bytes, "text/csv")}},
+        "image": {"endpoint": "/process-rfq-image", "files": {"file": ("RFQ_sample.png", image_bytes, "image/png")}},
+    }
+
+async def _send(client: httpx.AsyncClient, scenario: dict) -> httpx.Response:
+    if "files" in scenario:
+        return await client.post(scenario["endpoint"], files=scenario["files"])
+    payload = {"rfq_text": random.choice(SAMPLE_RFQ_TEXTS)}
+    return await client.post(scenario["endpoint"], params=scenario["params"], json=payload)
+
+def _is_success(response: httpx.Response) -> bool:
+    """HTTP success, and for OCR also that Tesseract actually ran (the endpoint reports its errors as text with a 200)."""
+    if response.status_code >= 400:
+        return False
+    if response.request.url.path == "/process-rfq-image":
+        return "Pytesseract error" not in response.json().get("extracted_rfq_text", "")
+    return True
+
+# --- Server lifecycle ---
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(port: int, workers: int) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "uvicorn", "src.app.main:app", "--host", "127.0.0.1",
+           "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(cmd, cwd=ROOT)
+
+async def wait_until_ready(base_url: str, server: Optional[subprocess.Popen] = None, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            if server is not None and server.poll() is not None:
+                raise RuntimeError(f"Server exited with code {server.returncode} before becoming ready.")
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not become ready within {timeout:.0f}s.")
+
+# --- Load generation ---
+async def run_load(base_url: str, mix: Dict[str, int], concurrency: int, duration: float, warmup: float) -> Dict[str, dict]:
+    scenarios = build_scenarios()
+    names, weights = list(mix.keys()), list(mix.values())
+    samples: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    started = time.monotonic()
+    measure_from, stop_at = started + warmup, started + warmup + duration
+    measured_until = stop_at
+
+    async def worker(client: httpx.AsyncClient):
+        nonlocal measured_until
+        while time.monotonic() < stop_at:
+            name = random.choices(names, weights=weights)[0]
+            started_at, t0 = time.monotonic(), time.perf_counter()
+            try:
+                ok = _is_success(await _send(client, scenarios[name]))
+            except (httpx.HTTPError, ValueError):
+                ok = False
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            if started_at < measure_from:
+                continue  # Requests started during warm-up are not recorded
+            # Requests started before stop_at are recorded even if they finish after it,
+            # so the measured window is stretched to cover them
+            measured_until = max(measured_until, time.monotonic())
+            samples[name].append(elapsed_ms)
+            if not ok:
+                errors[name] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+
+    measured_seconds = measured_until - measure_from
+    return {name: summarize(samples[name], errors[name], measured_seconds) for name in names}
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def summarize(latencies_ms: List[float], error_count: int, measured_seconds: float) -> dict:
+    values = sorted(latencies_ms)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": error_count,
+        "error_rate_pct": round(100 * error_count / count, 2) if count else 0.0,
+        "throughput_rps": round(count / measured_seconds, 2) if measured_seconds > 0 else 0.0,
+        "p50_ms": round(_percentile(values, 50), 1),
+        "p95_ms": round(_percentile(values, 95), 1),
+        "p99_ms": round(_percentile(values, 99), 1),
+        "max_ms": round(values[-1], 1) if values else 0.0,
+    }
+
+# --- Reporting ---
+def print_report(results: Dict[str, dict], baseline: Optional[Dict[str, dict]] = None) -> None:
+    header = f"{'scenario':<10} {'reqs':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err %':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<10} {r['requests']:>7} {r['throughput_rps']:>8.2f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['error_rate_pct']:>7.2f}")
+        if baseline and name in baseline:
+            b = baseline[name]
+            delta = lambda key: f"{(r[key] - b[key]) / b[key] * 100:+.0f}%" if b[key] else "n/a"
+            print(f"{'  vs base':<10} {'':>7} {delta('throughput_rps'):>8} {delta('p50_ms'):>9} {delta('p95_ms'):>9} {delta('p99_ms'):>9}")
+
+def save_results(config: dict, results: Dict[str, dict]) -> Path:
+    RESULTS_DIR.mkdir(exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    label = f"-{config['label']}" if config.get("label") else ""
+    path = RESULTS_DIR / f"{stamp}{label}.json"
+    path.write_text(json.dumps({"config": config, "results": results}, indent=2))
+    return path
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown scenario(s): {', '.join(sorted(unknown))}. Choose from {', '.join(DEFAULT_MIX)}.")
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local load test against the quote engine.")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent in-flight requests")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured warm-up seconds")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="weighted scenarios, e.g. text_json=5,csv=2,image=1")
+    parser.add_argument("--url", help="target an already running server instead of starting one")
+    parser.add_argument("--label", help="suffix for the saved results file")
+    parser.add_argument("--compare", type=Path, help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    if "image" in args.mix and not args.url and shutil.which("tesseract") is None:
+        parser.error("the 'image' scenario needs the tesseract binary on PATH; install it or drop image from --mix")
+
+    server, base_url = None, args.url
+    if not base_url:
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(port, args.workers)
+    try:
+        asyncio.run(wait_until_ready(base_url, server))
+        workers = f"workers={args.workers}, " if server else ""
+        print(f"Load testing {base_url} ({workers}concurrency={args.concurrency}, duration={args.duration:.0f}s)")
+        results = asyncio.run(run_load(base_url, args.mix, args.concurrency, args.duration, args.warmup))
+    finally:
+        if server:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+
+    config = {k: v for k, v in vars(args).items() if k != "compare"}
+    if args.url:
+        del config["workers"]  # Worker count of an external server is unknown
+    config.update(url=base_url, git_rev=_git_rev())
+    baseline = json.loads(args.compare.read_text())["results"] if args.compare else None
+    print_report(results, baseline)
+    print(f"\nResults saved to {save_results(config, results)}")
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    os.chdir(ROOT)
+    main()
@@ -0,0 +1,289 @@
+# src/app/catalog.py
+
+import os, re, sqlite3, threading
+import pandas as pd
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Set
+from .models import PriceMasterItem
+from .data_loader import data_loader, DATA_PATH
+
+# --- Configuration ---
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "memory")        # "memory" or "sqlite"
+HOT_SET_SIZE = int(os.getenv("CATALOG_HOT_SET_SIZE", "5000"))    # PriceMasterItems kept in memory by the SQLite backend
+QUERY_CACHE_MAX_ROWS = int(os.getenv("CATALOG_QUERY_CACHE_ROWS", str(HOT_SET_SIZE)))  # Rows held by cached candidate sets
+FULL_SCAN_MAX_ROWS = 5000       # Below this, candidate sets are read in full
+TEXT_CANDIDATE_LIMIT = 500      # Above it, each candidate set is capped to the best full-text matches
+IMPORT_CHUNK_ROWS = 50_000
+
+# Column names as they appear in price_master.csv (the PriceMasterItem aliases)
+CSV_COLUMNS = [field.alias for field in PriceMasterItem.model_fields.values()]
+COLUMN_TYPES = {'coil_length_m': 'REAL', 'size_od_mm': 'REAL', 'moq': 'INTEGER', 'lead_time_days': 'INTEGER',
+                'rate_inr': 'REAL', 'rate_alt_inr': 'REAL'}
+
+
+class LRUCache:
+    """
+    A small ordered-dict LRU. Entries can carry a weight (e.g. rows held), and the
+    least recently used ones are evicted once the total weight exceeds max_size.
+    Not thread-safe on its own; callers hold their own lock.
+    """
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.total_weight = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        if key not in self._data:
+            return None
+        self._data.move_to_end(key)
+        return self._data[key][0]
+
+    def put(self, key: Hashable, value: Any, weight: int = 1) -> None:
+        if key in self._data:
+            self.total_weight -= self._data[key][1]
+        self._data[key] = (value, weight)
+        self._data.move_to_end(key)
+        self.total_weight += weight
+        # Always keep the newest entry, even if it alone is over budget
+        while self.total_weight > self.max_size and len(self._data) > 1:
+            _, (_, evicted_weight) = self._data.popitem(last=False)
+            self.total_weight -= evicted_weight
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class InMemoryCatalog:
+    """The original behaviour: the whole price master as a list of PriceMasterItems."""
+    def __init__(self, items: List[PriceMasterItem]):
+        self.items = items
+        self._by_sku = {item.sku: item for item in items}
+
+    def get_item(self, sku: str) -> Optional[PriceMasterItem]:
+        return self._by_sku.get(sku)
+
+    def items_in_families(self, families: Sequence[str], query: str = "") -> List[PriceMasterItem]:
+        return [item for item in self.items if item.family in families]
+
+    def items_near_size(self, size_mm: float, tolerance_mm: float, query: str = "") -> List[PriceMasterItem]:
+        return [item for item in self.items if item.size_od_mm and abs(item.size_od_mm - size_mm) < tolerance_mm]
+
+    def closest_sizes(self, size_mm: float, limit: int) -> List[PriceMasterItem]:
+        return sorted([item for item in self.items if item.size_od_mm], key=lambda x: abs(x.size_od_mm - size_mm))[:limit]
+
+    def text_candidates(self, query: str) -> List[PriceMasterItem]:
+        return self.items
+
+
+class SqliteCatalog:
+    """
+    Price master imported into an indexed SQLite file and queried on demand.
+    Only the candidate sets the mapper asks for are materialised, and recently used
+    items/queries are kept in bounded LRUs, so resident memory stays small for very large catalogs.
+    """
+    def __init__(self, csv_path: Path, db_path: Path, hot_set_size: int = HOT_SET_SIZE):
+        self.csv_path, self.db_path = Path(csv_path), Path(db_path)
+        if not self.db_path.exists() or self.db_path.stat().st_mtime < self.csv_path.stat().st_mtime:
+            self._import_csv()
+        self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._hot_items = LRUCache(hot_set_size)
+        self._query_cache = LRUCache(QUERY_CACHE_MAX_ROWS)
+        self.row_count = self._conn.execute("SELECT COUNT(*) FROM price_master").fetchone()[0]
+
+    # --- Import ---
+    def _import_csv(self) -> None:
+        # Build into a temp file and swap it in, so concurrent workers never see a half-built DB
+        tmp_path = self.db_path.with_name(f"{self.db_path.name}.{os.getpid()}.tmp")
+        tmp_path.unlink(missing_ok=True)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            column_defs = ", ".join(f"{col} {COLUMN_TYPES.get(col, 'TEXT')}" for col in CSV_COLUMNS)
+            conn.execute(f"CREATE TABLE price_master ({column_defs})")
+            insert_sql = f"INSERT INTO price_master ({', '.join(CSV_COLUMNS)}) VALUES ({', '.join('?' * len(CSV_COLUMNS))})"
+            for chunk in pd.read_csv(self.csv_path, dtype={'hsn_code': str}, chunksize=IMPORT_CHUNK_ROWS):
+                chunk = chunk[CSV_COLUMNS].astype(object).where(chunk[CSV_COLUMNS].notna(), None)
+                conn.executemany(insert_sql, chunk.itertuples(index=False, name=None))
+            conn.execute("CREATE INDEX idx_price_master_family ON price_master (product_family)")
+            conn.execute("CREATE INDEX idx_price_master_size ON price_master (size_od_mm)")
+            conn.execute("CREATE INDEX idx_price_master_sku ON price_master (sku_code)")
+            conn.execute("CREATE VIRTUAL TABLE price_master_fts USING fts5(description, product_family, content='price_master', content_rowid='rowid')")
+            conn.execute("INSERT INTO price_master_fts(price_master_fts) VALUES ('rebuild')")
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, self.db_path)
+
+    # --- Row materialisation ---
+    def _to_item(self, row: sqlite3.Row) -> PriceMasterItem:
+        item = self._hot_items.get(row['sku_code'])
+        if item is None:
+            item = PriceMasterItem(**{col: row[col] for col in CSV_COLUMNS})
+            self._hot_items.put(item.sku, item)
+        return item
+
+    def _query(self, sql: str, params: Sequence = ()) -> List[PriceMasterItem]:
+        with self._lock:
+            return [self._to_item(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def _cached(self, key: Hashable, loader: Callable[[], List[PriceMasterItem]]) -> List[PriceMasterItem]:
+        with self._lock:
+            hit = self._query_cache.get(key)
+        if hit is not None:
+            return hit
+        result = loader()
+        with self._lock:
+            self._query_cache.put(key, result, weight=max(1, len(result)))
+        return result
+
+    # --- Lookups used by SkuMapper ---
+    def get_item(self, sku: str) -> Optional[PriceMasterItem]:
+        with self._lock:
+            item = self._hot_items.get(sku)
+        if item is not None:
+            return item
+        rows = self._query("SELECT * FROM price_master WHERE sku_code = ? ORDER BY rowid LIMIT 1", (sku,))
+        return rows[0] if rows else None
+
+    def _candidates(self, key: Hashable, where: str, params: Sequence, query: str) -> List[PriceMasterItem]:
+        """
+        Rows matching `where`. Small catalogs return them all; large ones return at most
+        TEXT_CANDIDATE_LIMIT rows, the best full-text matches for `query` first, topped up
+        from the index in rowid order so a query with few or no text hits still gets candidates.
+        """
+        if self.row_count <= FULL_SCAN_MAX_ROWS:
+            return self._cached(key, lambda: self._query(
+                f"SELECT * FROM price_master WHERE {where} ORDER BY rowid", params))
+        tokens = re.findall(r'\w+', (query or "").lower())
+        match_expr = " OR ".join(f'"{token}"*' for token in tokens)
+        return self._cached((*key, match_expr), lambda: self._ranked_with_top_up(where, params, match_expr))
+
+    def _ranked_with_top_up(self, where: str, params: Sequence, match_expr: str) -> List[PriceMasterItem]:
+        with self._lock:
+            rows = []
+            if match_expr:
+                rows = self._conn.execute(
+                    "SELECT price_master.rowid, price_master.* FROM price_master_fts JOIN price_master ON price_master.rowid = price_master_fts.rowid "
+                    f"WHERE price_master_fts MATCH ? AND {where} ORDER BY bm25(price_master_fts) LIMIT ?",
+                    (match_expr, *params, TEXT_CANDIDATE_LIMIT)).fetchall()
+            if len(rows) < TEXT_CANDIDATE_LIMIT:
+                seen = {row['rowid'] for row in rows}
+                top_up = self._conn.execute(
+                    f"SELECT price_master.rowid, price_master.* FROM price_master WHERE {where} ORDER BY rowid LIMIT ?",
+                    (*params, TEXT_CANDIDATE_LIMIT + len(rows))).fetchall()
+                rows += [row for row in top_up if row['rowid'] not in seen][:TEXT_CANDIDATE_LIMIT - len(rows)]
+            return [self._to_item(row) for row in rows]
+
+    def items_in_families(self, families: Sequence[str], query: str = "") -> List[PriceMasterItem]:
+        placeholders = ", ".join("?" * len(families))
+        return self._candidates(("family", tuple(families)), f"price_master.product_family IN ({placeholders})", tuple(families), query)
+
+    def items_near_size(self, size_mm: float, tolerance_mm: float, query: str = "") -> List[PriceMasterItem]:
+        return self._candidates(("size", size_mm, tolerance_mm), "price_master.size_od_mm > ? AND price_master.size_od_mm < ?",
+                                (size_mm - tolerance_mm, size_mm + tolerance_mm), query)
+
+    def closest_sizes(self, size_mm: float, limit: int) -> List[PriceMasterItem]:
+        # Walk the size index outwards from both sides instead of sorting the whole table
+        with self._lock:
+            above = self._conn.execute("SELECT rowid, * FROM price_master WHERE size_od_mm >= ? ORDER BY size_od_mm, rowid LIMIT ?", (size_mm, limit)).fetchall()
+            below = self._conn.execute("SELECT rowid, * FROM price_master WHERE size_od_mm < ? AND size_od_mm > 0 ORDER BY size_od_mm DESC, rowid LIMIT ?", (size_mm, limit)).fetchall()
+            rows = sorted(above + below, key=lambda r: (abs(r['size_od_mm'] - size_mm), r['rowid']))[:limit]
+            return [self._to_item(row) for row in rows]
+
+    def text_candidates(self, query: str) -> List[PriceMasterItem]:
+        return self._candidates(("all",), "1", (), query)
+
+
+def _is_unavailable(value: Any) -> bool:
+    """Blank means available; 0 / false / no (in any spelling, including "0.0") hide the SKU."""
+    text = str(value).strip().lower() if value is not None else ""
+    try:
+        return float(text) == 0
+    except ValueError:
+        return text in ('false', 'no', 'n')
+
+
+class BuyerCatalog:
+    """
+    A buyer's negotiated price list overlaid on a base catalog. Overridden SKUs get the
+    buyer's rate_inr / rate_alt_inr (blank cells keep the base rate), and SKUs marked
+    unavailable are hidden from every lookup. Everything else is served by the base catalog.
+    """
+    def __init__(self, base, buyer_id: str, overrides: Dict[str, dict], unavailable: Set[str]):
+        self.base, self.buyer_id = base, buyer_id
+        self.overrides, self.unavailable = overrides, unavailable
+        self._priced: Dict[str, PriceMasterItem] = {}
+
+    @classmethod
+    def from_csv(cls, base, buyer_id: str, csv_path: Path) -> "BuyerCatalog":
+        # Everything is read as text (a blank `available` cell would otherwise turn "0" into "0.0"),
+        # and spaces around header names and cells are ignored.
+        df = pd.read_csv(csv_path, dtype=str, skipinitialspace=True)
+        df.columns = df.columns.str.strip()
+        if 'sku_code' not in df.columns:
+            raise ValueError(f"Price list for buyer '{buyer_id}' ({csv_path.name}) has no sku_code column.")
+        df = df.astype(object).where(df.notna(), None)
+        overrides, unavailable = {}, set()
+        for line_no, row in enumerate(df.to_dict(orient='records'), start=2):
+            sku = (row['sku_code'] or "").strip()
+            if not sku:
+                print(f"⚠ Skipping {csv_path.name} line {line_no}: no sku_code.")
+                continue
+            if _is_unavailable(row.get('available')):
+                unavailable.add(sku)
+                continue
+            try:
+                update = {field: float(row[col]) for field, col in (('rate_pp', 'rate_inr'), ('rate_frpp', 'rate_alt_inr'))
+                          if (row.get(col) or "").strip()}
+            except ValueError:
+                print(f"⚠ Skipping {csv_path.name} line {line_no} ({sku}): non-numeric rate.")
+                continue
+            if update:
+                overrides[sku] = update
+        return cls(base, buyer_id, overrides, unavailable)
+
+    @property
+    def row_count(self) -> int:
+        return len(self.overrides) + len(self.unavailable)
+
+    def _overlay(self, item: PriceMasterItem) -> PriceMasterItem:
+        if item.sku not in self.overrides:
+            return item
+        priced = self._priced.get(item.sku)
+        if priced is None:
+            priced = self._priced[item.sku] = item.model_copy(update=self.overrides[item.sku])
+        return priced
+
+    def _overlay_all(self, items: List[PriceMasterItem]) -> List[PriceMasterItem]:
+        return [self._overlay(item) for item in items if item.sku not in self.unavailable]
+
+    def get_item(self, sku: str) -> Optional[PriceMasterItem]:
+        item = None if sku in self.unavailable else self.base.get_item(sku)
+        return self._overlay(item) if item else None
+
+    def items_in_families(self, families: Sequence[str], query: str = "") -> List[PriceMasterItem]:
+        return self._overlay_all(self.base.items_in_families(families, query))
+
+    def items_near_size(self, size_mm: float, tolerance_mm: float, query: str = "") -> List[PriceMasterItem]:
+        return self._overlay_all(self.base.items_near_size(size_mm, tolerance_mm, query))
+
+    def closest_sizes(self, size_mm: float, limit: int) -> List[PriceMasterItem]:
+        return self._overlay_all(self.base.closest_sizes(size_mm, limit + len(self.unavailable)))[:limit]
+
+    def text_candidates(self, query: str) -> List[PriceMasterItem]:
+        return self._overlay_all(self.base.text_candidates(query))
+
+
+def load_catalog(data_path: Path = DATA_PATH, backend: str = CATALOG_BACKEND):
+    """Builds the catalog backend selected by CATALOG_BACKEND."""
+    if backend == "sqlite":
+        db_path = Path(os.getenv("CATALOG_DB_PATH", data_path / "price_master.sqlite3"))
+        return SqliteCatalog(data_path / "price_master.csv", db_path)
+    if backend == "memory":
+        return InMemoryCatalog(data_loader.get_price_master())
+    raise ValueError(f"Unknown CATALOG_BACKEND '{backend}'. Use 'memory' or 'sqlite'.")
@@ -1,30 +1,24 @@
 # src/app/data_loader.py (REPLACE THE ENTIRE CLASS)
 
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
 from .models import PriceMasterItem, TaxItem
 
 class DataLoader:
     def __init__(self, data_path: Path):
+        self.data_path = data_path
+        # The price master is loaded on first use, so the SQLite catalog backend
+        # (see catalog.py) never has to hold the whole CSV in memory.
+        self.price_master_items: Optional[List[PriceMasterItem]] = None
+
         # 1. Read the data, letting Pandas infer missing values as NaN
-        self.price_master_df = pd.read_csv(data_path / "price_master.csv")
         self.taxes_df = pd.read_csv(data_path / "taxes.csv")
 
-        # 2. --- DATA CLEANING STEP ---
-        #    Replace pandas' NaN/NA representations with Python's None.
-        #    Pydantic understands None for Optional fields, but not NaN.
-        self.price_master_df = self.price_master_df.replace({pd.NA: None, float('nan'): None})
-
-        # 3. Ensure key columns are the correct type before validation
-        self.price_master_df['hsn_code'] = self.price_master_df['hsn_code'].astype(str)
+        # 2. Ensure key columns are the correct type before validation
         self.taxes_df['Hsn_code'] = self.taxes_df['Hsn_code'].astype(str)
-        
-        # 4. Now, with clean data, validate and create Pydantic models
-        self.price_master_items: List[PriceMasterItem] = [
-            PriceMasterItem(**row) for row in self.price_master_df.to_dict(orient='records')
-        ]
-        
+
+        # 3. Validate and create Pydantic models
         self.tax_items: List[TaxItem] = [
             TaxItem(**row) for row in self.taxes_df.to_dict(orient='records')
         ]
@@ -33,7 +27,25 @@ class DataLoader:
             item.hsn_code: item.gst_pct for item in self.tax_items
         }
 
+    def _load_price_master(self) -> List[PriceMasterItem]:
+        # 1. Read the data, letting Pandas infer missing values as NaN
+        #    The DataFrame stays local so only the PriceMasterItem list is kept in memory.
+        price_master_df = pd.read_csv(self.data_path / "price_master.csv")
+
+        # 2. --- DATA CLEANING STEP ---
+        #    Replace pandas' NaN/NA representations with Python's None.
+        #    Pydantic understands None for Optional fields, but not NaN.
+        price_master_df = price_master_df.replace({pd.NA: None, float('nan'): None})
+
+        # 3. Ensure key columns are the correct type before validation
+        price_master_df['hsn_code'] = price_master_df['hsn_code'].astype(str)
+
+        # 4. Now, with clean data, validate and create Pydantic models
+        return [PriceMasterItem(**row) for row in price_master_df.to_dict(orient='records')]
+
     def get_price_master(self) -> List[PriceMasterItem]:
+        if self.price_master_items is None:
+            self.price_master_items = self._load_price_master()
         return self.price_master_items
 
     def get_tax_map(self) -> Dict[str, float]:
@@ -2,14 +2,14 @@
 
 import uuid, traceback, io, pandas as pd
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from PIL import Image
 
-from .models import RFQRequest, Quote
+from .models import RFQRequest, Quote, BUYER_ID_PATTERN
 from .parser import parse_rfq_to_lines
-from .mapper import sku_mapper
+from .mapper import get_sku_mapper
 from .pricer import calculate_quote_totals
 from .outputs import generate_csv, generate_pdf
 from .processor import RfqOCRProcessor
@@ -38,6 +38,7 @@ async def generate_quote(request: RFQRequest, response_format: str = 'json', is_
         if not rfq_text_to_process:
             raise HTTPException(status_code=400, detail="No valid RFQ text or chat_payload provided.")
 
+        sku_mapper = get_sku_mapper(request.buyer_id)
         parsed_lines = parse_rfq_to_lines(rfq_text_to_process)
         quote_lines = sku_mapper.create_quote_lines(parsed_lines)
         
@@ -45,14 +46,14 @@ async def generate_quote(request: RFQRequest, response_format: str = 'json', is_
             for i, line in enumerate(quote_lines):
                 if not line.resolved and line.explain.candidates:
                     top_candidate_sku = line.explain.candidates[0]['sku']
-                    top_item = next((item for item in sku_mapper.price_master if item.sku == top_candidate_sku), None)
+                    top_item = sku_mapper.get_item(top_candidate_sku)
                     if top_item:
                         explain = line.explain
                         explain.status = "APPROVED"
                         explain.reason = f"Manually approved from top candidate (Original score: {explain.score:.1f})"
                         quote_lines[i] = sku_mapper._create_matched_quoteline(parsed_lines[i], line.line_no, top_item, explain)
         
-        quote = Quote(quote_id=f"Q-TXT-{uuid.uuid4().hex[:4].upper()}", lines=quote_lines, header_discount_pct=request.header_discount_pct, currency=request.target_currency)
+        quote = Quote(quote_id=f"Q-TXT-{uuid.uuid4().hex[:4].upper()}", buyer_id=request.buyer_id, lines=quote_lines, header_discount_pct=request.header_discount_pct, currency=request.target_currency)
         freight_rule = {"threshold": 50000, "charge": 1000}
         quote = calculate_quote_totals(quote=quote, freight_is_taxable=True, freight_amount_rule=freight_rule)
         
@@ -74,7 +75,7 @@ async def generate_quote(request: RFQRequest, response_format: str = 'json', is_
 
 # --- THIS IS THE ENDPOINT THAT WAS MISSING ---
 @app.post("/process-rfq-image")
-async def process_rfq_image(file: UploadFile = File(...)):
+async def process_rfq_image(file: UploadFile = File(...), buyer_id: str = Query("ACME01", pattern=BUYER_ID_PATTERN)):
     if not file.content_type.startswith('image/'): raise HTTPException(status_code=400, detail="File is not an image.")
     try:
         contents = await file.read()
@@ -87,8 +88,8 @@ async def process_rfq_image(file: UploadFile = File(...)):
         if not cleaned_rfq_text: raise HTTPException(status_code=400, detail="OCR could not extract text.")
         
         parsed_lines = parse_rfq_to_lines(cleaned_rfq_text)
-        quote_lines = sku_mapper.create_quote_lines(parsed_lines)
-        quote = Quote(quote_id=f"Q-OCR-{uuid.uuid4().hex[:4].upper()}", lines=quote_lines, header_discount_pct=0.0)
+        quote_lines = get_sku_mapper(buyer_id).create_quote_lines(parsed_lines)
+        quote = Quote(quote_id=f"Q-OCR-{uuid.uuid4().hex[:4].upper()}", buyer_id=buyer_id, lines=quote_lines, header_discount_pct=0.0)
         freight_rule = {"threshold": 50000, "charge": 1000}
         quote = calculate_quote_totals(quote=quote, freight_is_taxable=True, freight_amount_rule=freight_rule)
         
@@ -99,7 +100,7 @@ async def process_rfq_image(file: UploadFile = File(...)):
 
 # --- THIS IS THE CSV ENDPOINT ---
 @app.post("/process-rfq-csv")
-async def process_rfq_csv(file: UploadFile = File(...)):
+async def process_rfq_csv(file: UploadFile = File(...), buyer_id: str = Query("ACME01", pattern=BUYER_ID_PATTERN)):
     if not file.filename.endswith('.csv'): raise HTTPException(status_code=400, detail="File is not a CSV.")
     try:
         df = pd.read_csv(io.BytesIO(await file.read()))
@@ -112,8 +113,8 @@ async def process_rfq_csv(file: UploadFile = File(...)):
         rfq_text = "\n".join([f"{row[desc_col]} {row[qty_col]} {row[uom_col]}" for _, row in df.iterrows()])
         
         parsed_lines = parse_rfq_to_lines(rfq_text)
-        quote_lines = sku_mapper.create_quote_lines(parsed_lines)
-        quote = Quote(quote_id=f"Q-CSV-{uuid.uuid4().hex[:4].upper()}", lines=quote_lines, header_discount_pct=0.0)
+        quote_lines = get_sku_mapper(buyer_id).create_quote_lines(parsed_lines)
+        quote = Quote(quote_id=f"Q-CSV-{uuid.uuid4().hex[:4].upper()}", buyer_id=buyer_id, lines=quote_lines, header_discount_pct=0.0)
         freight_rule = {"threshold": 50000, "charge": 1000}
         quote = calculate_quote_totals(quote=quote, freight_is_taxable=True, freight_amount_rule=freight_rule)
 
@@ -1,19 +1,28 @@
 # src/app/mapper.py (FINAL AND DEFINITIVE VERSION)
 
-import re
-from typing import List
+import os, re, threading, time, traceback
+from pathlib import Path
+from typing import List, Optional
 from rapidfuzz import process, fuzz
-from .models import ParsedLine, QuoteLine, PriceMasterItem, Explainability
-from .data_loader import data_loader
+from .models import ParsedLine, QuoteLine, PriceMasterItem, Explainability, BUYER_ID_PATTERN
+from .catalog import load_catalog, BuyerCatalog, LRUCache
+from .data_loader import DATA_PATH
 
 # --- Configuration ---
 SCORE_THRESHOLD_AUTO_MAP = 85
 SCORE_DELTA_AUTO_MAP = 15
 FAMILIES_WITHOUT_SIZE_FILTER = ["GI Fan Box", "Junction Box", "Modular Box", "Cable Tie", "Gland", "Saddle Clamp"]
+BUYER_PRICE_LIST_DIR = Path(os.getenv("BUYER_PRICE_LIST_DIR", DATA_PATH / "buyers"))
+BUYER_CACHE_MAX_ROWS = int(os.getenv("BUYER_CACHE_MAX_ROWS", "200000"))  # Price-list rows kept loaded across all buyers
+BUYER_PRICE_LIST_RECHECK_SECONDS = float(os.getenv("BUYER_PRICE_LIST_RECHECK_SECONDS", "30"))  # How often a buyer's CSV is re-stat'ed
 
 class SkuMapper:
-    def __init__(self, price_master: List[PriceMasterItem]):
-        self.price_master = price_master
+    def __init__(self, catalog):
+        # Any catalog backend from catalog.py (InMemoryCatalog or SqliteCatalog)
+        self.catalog = catalog
+
+    def get_item(self, sku: str) -> Optional[PriceMasterItem]:
+        return self.catalog.get_item(sku)
 
     def create_quote_lines(self, parsed_lines: List[ParsedLine]) -> List[QuoteLine]:
         quote_lines = []
@@ -24,11 +33,11 @@ class SkuMapper:
 
     def _map_line_to_sku(self, parsed_line: ParsedLine, line_no: int) -> QuoteLine:
         
-        candidates = self.price_master
         search_query = " ".join(parsed_line.description_keywords + parsed_line.material_keywords)
 
         # --- Intelligent Filtering ---
-        initial_candidates = self.price_master
+        # Only the candidate set each line needs is fetched from the catalog
+        initial_candidates = None
         
         # Determine if this item type should skip the size filter
         should_skip_size_filter = False
@@ -36,22 +45,24 @@ class SkuMapper:
             if family_keyword in parsed_line.raw_text.lower():
                 should_skip_size_filter = True
                 # Pre-filter by the likely family
-                initial_candidates = [c for c in self.price_master if c.family in FAMILIES_WITHOUT_SIZE_FILTER]
+                initial_candidates = self.catalog.items_in_families(FAMILIES_WITHOUT_SIZE_FILTER, search_query)
                 break
         
         if not should_skip_size_filter and parsed_line.size:
             TOLERANCE_MM = 1.0
-            size_candidates = [item for item in initial_candidates if item.size_od_mm and abs(item.size_od_mm - parsed_line.size) < TOLERANCE_MM]
+            size_candidates = self.catalog.items_near_size(parsed_line.size, TOLERANCE_MM, search_query)
             
             if not size_candidates:
                 # Handle "33mm" case by suggesting alternatives
-                sorted_by_size = sorted([item for item in self.price_master if item.size_od_mm], key=lambda x: abs(x.size_od_mm - parsed_line.size))
+                sorted_by_size = self.catalog.closest_sizes(parsed_line.size, limit=3)
                 reason = f"No item found with size {parsed_line.size:.1f}mm. Closest available sizes are shown."
                 explain = Explainability(input_text=parsed_line.raw_text, status="NEEDS_REVIEW", reason=reason, candidates=[{"sku": c.sku, "desc": c.item_description} for c in sorted_by_size[:3]])
                 return self._create_unmatched_quoteline(parsed_line, line_no, reason, explain)
             candidates = size_candidates
-        else:
+        elif should_skip_size_filter:
             candidates = initial_candidates
+        else:
+            candidates = self.catalog.text_candidates(search_query)
 
         # --- Scoring ---
         candidate_choices = {f"{c.item_description} {c.family}": c for c in candidates}
@@ -115,5 +126,63 @@ class SkuMapper:
         if not explain:
             explain = Explainability(input_text=parsed_line.raw_text, status="NOT_FOUND", reason=reason)
         return QuoteLine(line_no=line_no, input_text=parsed_line.raw_text, resolved=False, qty=parsed_line.quantity, uom=parsed_line.uom, explain=explain)
-# --- Singleton instance for use in the main app ---
-sku_mapper = SkuMapper(data_loader.get_price_master())
\ No newline at end of file
+
+class BuyerMapperRegistry:
+    """
+    Hands out a SkuMapper per buyer. A buyer's price list (<buyer_id>.csv in BUYER_PRICE_LIST_DIR)
+    is loaded on first use and kept in an LRU bounded by the total number of price-list rows;
+    buyers without a price list are priced from the base mapper. Both outcomes are cached, and
+    the CSV's mtime is re-checked at most every BUYER_PRICE_LIST_RECHECK_SECONDS, so edited or
+    newly added price lists are picked up without a restart.
+    """
+    def __init__(self, base_mapper: SkuMapper, price_list_dir: Path, max_rows: int):
+        self.base_mapper, self.price_list_dir = base_mapper, price_list_dir
+        self._mappers = LRUCache(max_rows)
+        self._lock = threading.Lock()
+
+    def _price_list_mtime(self, buyer_id: str) -> Optional[float]:
+        try:
+            return (self.price_list_dir / f"{buyer_id}.csv").stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def get(self, buyer_id: Optional[str]) -> SkuMapper:
+        if not buyer_id:
+            return self.base_mapper
+        if not re.match(BUYER_ID_PATTERN, buyer_id):
+            raise ValueError(f"Invalid buyer_id '{buyer_id}'.")
+        now = time.monotonic()
+        with self._lock:
+            entry = self._mappers.get(buyer_id)  # [mapper or load error, csv mtime or None, last checked]
+        if entry is not None and (now - entry[2] < BUYER_PRICE_LIST_RECHECK_SECONDS or self._price_list_mtime(buyer_id) == entry[1]):
+            entry[2] = now
+        else:
+            entry = self._load(buyer_id, now)
+        if isinstance(entry[0], Exception):
+            raise ValueError(str(entry[0]))
+        return entry[0]
+
+    def _load(self, buyer_id: str, now: float) -> list:
+        mtime = self._price_list_mtime(buyer_id)
+        if mtime is None:
+            mapper, weight = self.base_mapper, 1
+        else:
+            try:
+                catalog = BuyerCatalog.from_csv(self.base_mapper.catalog, buyer_id, self.price_list_dir / f"{buyer_id}.csv")
+                mapper, weight = SkuMapper(catalog), max(1, catalog.row_count)
+            except Exception as e:
+                # Cache the failure too, so a broken price list is not re-read on every request;
+                # it is retried once the CSV's mtime changes.
+                traceback.print_exc()
+                mapper, weight = ValueError(f"Could not load price list for buyer '{buyer_id}': {e}"), 1
+        entry = [mapper, mtime, now]
+        with self._lock:
+            self._mappers.put(buyer_id, entry, weight=weight)
+        return entry
+
+# --- Singleton instances for use in the main app ---
+sku_mapper = SkuMapper(load_catalog())
+buyer_mappers = BuyerMapperRegistry(sku_mapper, BUYER_PRICE_LIST_DIR, BUYER_CACHE_MAX_ROWS)
+
+def get_sku_mapper(buyer_id: Optional[str]) -> SkuMapper:
+    return buyer_mappers.get(buyer_id)
\ No newline at end of file
@@ -3,6 +3,9 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 
+# Buyer ids double as price-list file names, so only safe characters are allowed
+BUYER_ID_PATTERN = r'^[A-Za-z0-9_-]+$'
+
 # Represents a single row in your price_master.csv
 class PriceMasterItem(BaseModel):
     sku: str = Field(..., alias='sku_code')
@@ -95,6 +98,7 @@ class Quote(BaseModel):
 # Input model for the API request
 class RFQRequest(BaseModel):
     rfq_text: str
+    buyer_id: str = Field("ACME01", pattern=BUYER_ID_PATTERN) # Selects the buyer's negotiated price list
     header_discount_pct: float = 0.0
     freight_is_taxable: bool = True
     target_currency: str = "INR" # ADD THIS LINE
\ No newline at end of file
@@ -5,30 +5,87 @@ import numpy as np
 import pytesseract
 from PIL import Image
 import re
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
+
+# --- Configuration ---
+TARGET_DPI = 300
+MAX_SHORT_SIDE_PX = 2480     # A4 width at 300 DPI; used when the image carries no DPI metadata.
+                             # Only the short side is capped so tall receipts keep their height for tiling.
+TILE_HEIGHT_PX = 1200        # Tall pages are OCR'd in horizontal bands of roughly this height
+TILE_OVERLAP_PX = 120        # Overlap so text lines cut by a band edge are read whole by a neighbour
+MAX_OCR_WORKERS = 4
 
 class RfqOCRProcessor:
     def __init__(self):
         self.confidence_threshold = 60
+        self._executor = ThreadPoolExecutor(max_workers=MAX_OCR_WORKERS, thread_name_prefix="ocr")
         print("✓ OCR Processor Initialized (using Tesseract).")
 
+    def normalize_image(self, image: Image.Image) -> Image.Image:
+        """Converts to grayscale once and scales the page down to Tesseract's target DPI."""
+        gray = image if image.mode == 'L' else image.convert('L')
+        dpi = image.info.get('dpi', (0, 0))[0]
+        if dpi:
+            # Trust the metadata: only scans above the target DPI are reduced
+            scale = TARGET_DPI / float(dpi)
+        else:
+            scale = MAX_SHORT_SIDE_PX / min(gray.size)
+        if scale >= 1.0:
+            return gray
+        new_size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        return gray.resize(new_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+
     def enhance_image(self, image: Image.Image) -> Image.Image:
-        cv_img = cv2.cvtColor(np.array(image.convert('RGB')), cv2.COLOR_RGB2BGR)
-        gray = cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY)
+        gray = np.asarray(image if image.mode == 'L' else image.convert('L'))
         thresh = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 5)
         return Image.fromarray(thresh)
 
+    def _tile_bounds(self, height: int) -> List[Tuple[int, int, int, int]]:
+        """
+        Splits a page into overlapping horizontal bands.
+        Returns (crop_top, crop_bottom, own_top, own_bottom) per band: the crop includes the
+        overlap, while the "owned" range splits each overlap at its midpoint so every word
+        is kept by exactly one band when stitching.
+        """
+        if height <= TILE_HEIGHT_PX + TILE_OVERLAP_PX:
+            return [(0, height, 0, height)]
+        step = TILE_HEIGHT_PX
+        starts = list(range(0, height - TILE_OVERLAP_PX, step))
+        bounds = []
+        for i, start in enumerate(starts):
+            crop_top = max(0, start - TILE_OVERLAP_PX // 2)
+            crop_bottom = min(height, start + step + TILE_OVERLAP_PX // 2) if i < len(starts) - 1 else height
+            own_top = start if i > 0 else 0
+            own_bottom = start + step if i < len(starts) - 1 else height
+            bounds.append((crop_top, crop_bottom, own_top, own_bottom))
+        return bounds
+
+    def _ocr_tile(self, tile: Image.Image, offset_y: int, own_top: int, own_bottom: int) -> List[Tuple[str, int]]:
+        data = pytesseract.image_to_data(tile, output_type=pytesseract.Output.DICT, lang='eng')
+        words = []
+        for i in range(len(data['text'])):
+            conf = int(float(data['conf'][i]))
+            if conf > 0 and data['text'][i].strip():
+                center_y = offset_y + data['top'][i] + data['height'][i] // 2
+                if own_top <= center_y < own_bottom:
+                    words.append((data['text'][i], conf))
+        return words
+
     def extract_text_with_confidence(self, image: Image.Image) -> tuple[str, float]:
         try:
-            data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT, lang='eng')
+            tiles = self._tile_bounds(image.height)
+            futures = [
+                self._executor.submit(self._ocr_tile, image.crop((0, top, image.width, bottom)), top, own_top, own_bottom)
+                for top, bottom, own_top, own_bottom in tiles
+            ]
+            # Bands are collected top-to-bottom, and Tesseract already returns reading order within a band
+            words = [word for future in futures for word in future.result()]
         except Exception as e:
             return f"Pytesseract error: {e}", 0.0
 
-        text_parts, confidences = [], []
-        for i in range(len(data['text'])):
-            if int(data['conf'][i]) > 0 and data['text'][i].strip():
-                text_parts.append(data['text'][i])
-                confidences.append(int(data['conf'][i]))
+        text_parts = [text for text, _ in words]
+        confidences = [conf for _, conf in words]
         return ' '.join(text_parts), np.mean(confidences) if confidences else 0.0
 
     def _basic_text_clean(self, text: str) -> str:
@@ -36,24 +93,27 @@ class RfqOCRProcessor:
 
     def process_pil_image(self, pil_image: Image.Image) -> Dict[str, Any]:
         try:
-            # Step 1: Extract text from the original image
-            extracted_text, initial_confidence = self.extract_text_with_confidence(pil_image)
+            # Step 0: Normalize resolution and color space once, up front
+            page = self.normalize_image(pil_image)
+
+            # Step 1: Extract text from the normalized image
+            extracted_text, initial_confidence = self.extract_text_with_confidence(page)
             current_text, enhancement_used, final_confidence = extracted_text, False, initial_confidence
 
             # Step 2: If confidence is low, try enhancing the image
             if initial_confidence < self.confidence_threshold:
                 enhancement_used = True
-                enhanced_img = self.enhance_image(pil_image)
+                enhanced_img = self.enhance_image(page)
                 enhanced_text, enhanced_confidence = self.extract_text_with_confidence(enhanced_img)
                 if enhanced_confidence > initial_confidence:
                     current_text = enhanced_text
                     final_confidence = enhanced_confidence
-            
+
             # Step 3: Perform basic cleaning and return. NO AI MODEL.
             final_text = self._basic_text_clean(current_text)
             return {
                 "final_cleaned_text": final_text,
-                "summary": f"Final Confidence: {final_confidence:.1f}%. Enhanced: {enhancement_used}."
+                "summary": f"Final Confidence: {final_confidence:.1f}%. Enhanced: {enhancement_used}. Size: {page.width}x{page.height}px."
             }
         except Exception as e:
-            return {"error": str(e)}
\ No newline at end of file
+            return {"error": str(e)}
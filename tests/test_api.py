@@ -29,4 +29,13 @@ def test_rfq2_processing_approver_mode():
     assert data['totals']['subtotal'] > 0
     # Based on RFQ-2 targets (GFB3HEXCPWD + NFC40 FRPP + PVC20L)
     # 7875 + 13275 + (assuming Light for flex conduit) 3400 = 24550 - this will depend on your mapper's top choice
-    assert abs(data['totals']['grand_total'] - 42749.04) < 10000 # Check it's in the right ballpark
\ No newline at end of file
+    assert abs(data['totals']['grand_total'] - 42749.04) < 10000 # Check it's in the right ballpark
+
+
+def test_buyer_price_list_is_applied():
+    """ Quotes for a buyer with a negotiated price list use that buyer's rates. """
+    rfq_text = 'pls quote 20mm flex conduit 600m, 40mm corr pipe 150m FRPP, and 3\" heavy hex fan box cpwd 25 nos'
+    base = client.post("/generate-quote?is_approved=true", json={"rfq_text": rfq_text}).json()
+    buyer = client.post("/generate-quote?is_approved=true", json={"rfq_text": rfq_text, "buyer_id": "BUILDCO"}).json()
+    assert base['buyer_id'] == "ACME01" and buyer['buyer_id'] == "BUILDCO"
+    assert buyer['totals']['subtotal'] < base['totals']['subtotal']
@@ -0,0 +1,109 @@
+# tests/test_catalog.py
+import os, time
+import pytest
+from src.app import catalog
+from src.app.catalog import InMemoryCatalog, SqliteCatalog, BuyerCatalog, LRUCache
+from src.app.data_loader import data_loader, DATA_PATH
+from src.app import mapper
+from src.app.mapper import SkuMapper, BuyerMapperRegistry
+from src.app.parser import parse_rfq_to_lines
+
+def test_sqlite_catalog_matches_in_memory_catalog(tmp_path):
+    """ The SQLite backend must return the same candidate sets, and therefore the same quote lines, as the in-memory one. """
+    memory = InMemoryCatalog(data_loader.get_price_master())
+    sqlite = SqliteCatalog(DATA_PATH / "price_master.csv", tmp_path / "price_master.sqlite3")
+    assert sqlite.row_count == len(memory.items)
+    assert [i.sku for i in sqlite.items_near_size(20, 1.0)] == [i.sku for i in memory.items_near_size(20, 1.0)]
+    assert [i.sku for i in sqlite.closest_sizes(33, 3)] == [i.sku for i in memory.closest_sizes(33, 3)]
+    assert sqlite.get_item("NFC20") == memory.get_item("NFC20")
+
+    rfq_text = 'pls quote 20mm flex conduit 600m, 40mm corr pipe 150m FRPP, and 3\" heavy hex fan box cpwd 25 nos'
+    parsed_lines = parse_rfq_to_lines(rfq_text)
+    from_sqlite = SkuMapper(sqlite).create_quote_lines(parsed_lines)
+    from_memory = SkuMapper(memory).create_quote_lines(parsed_lines)
+    assert [line.model_dump() for line in from_sqlite] == [line.model_dump() for line in from_memory]
+
+def test_sqlite_candidate_sets_are_bounded_on_large_catalogs(tmp_path, monkeypatch):
+    """ Above FULL_SCAN_MAX_ROWS every candidate set is capped, and cached sets are budgeted by rows. """
+    monkeypatch.setattr(catalog, "FULL_SCAN_MAX_ROWS", 10)
+    monkeypatch.setattr(catalog, "TEXT_CANDIDATE_LIMIT", 3)
+    sqlite = SqliteCatalog(DATA_PATH / "price_master.csv", tmp_path / "price_master.sqlite3")
+    sqlite._query_cache = LRUCache(5)
+    fan_boxes = sqlite.items_in_families(["GI Fan Box"], "hex fan box")
+    assert 0 < len(fan_boxes) <= 3 and all(item.family == "GI Fan Box" for item in fan_boxes)
+    assert len(sqlite.items_near_size(20, 1.0, "pvc conduit")) <= 3
+    assert len(sqlite.items_in_families(["Rigid PVC Conduit"])) == 3
+    assert sqlite._query_cache.total_weight <= 5
+
+
+def test_sqlite_candidates_fall_back_to_index_without_text_hits(tmp_path, monkeypatch):
+    """ On large catalogs a line whose words have no full-text hits still gets size, family and text candidates. """
+    monkeypatch.setattr(catalog, "FULL_SCAN_MAX_ROWS", 10)
+    monkeypatch.setattr(catalog, "TEXT_CANDIDATE_LIMIT", 3)
+    sqlite = SqliteCatalog(DATA_PATH / "price_master.csv", tmp_path / "price_master.sqlite3")
+    size_candidates = sqlite.items_near_size(20, 1.0, "tubing")
+    assert len(size_candidates) == 3 and all(abs(item.size_od_mm - 20) < 1.0 for item in size_candidates)
+    assert len(sqlite.items_in_families(["GI Fan Box"], "tubing")) == 3
+    assert len(sqlite.text_candidates("tubing")) == 3
+    # A single text hit is topped up, so the mapper still sees competing candidates
+    assert len(sqlite.items_near_size(25, 1.0, "cfp")) == 3
+
+
+def test_buyer_price_list_overlays_base_catalog():
+    """ A buyer's price list overrides rates and hides unavailable SKUs; other buyers keep base prices. """
+    base = InMemoryCatalog(data_loader.get_price_master())
+    buyer = BuyerCatalog.from_csv(base, "BUILDCO", DATA_PATH / "buyers" / "BUILDCO.csv")
+    assert buyer.get_item("NFC20").rate_pp == 16.5
+    assert buyer.get_item("NFC20").rate_frpp == 23
+    assert buyer.get_item("GFB3HEXCPWD").rate_frpp == base.get_item("GFB3HEXCPWD").rate_frpp
+    assert buyer.get_item("NFC25").rate_pp == 22  # Blank `available` cell means available
+    assert buyer.get_item("PVC50H") is None
+    assert "PVC50H" not in [item.sku for item in buyer.items_near_size(50, 1.0)]
+    assert base.get_item("NFC20").rate_pp == 18
+
+def test_buyer_price_list_skips_malformed_rows(tmp_path):
+    """ Rows without a SKU or with a non-numeric rate are skipped; spaces after header commas are tolerated. """
+    price_list = tmp_path / "SPACED.csv"
+    price_list.write_text("sku_code, rate_inr, rate_alt_inr, available\n"
+                          "NFC20, 16.5, , \n"
+                          ", 10, , \n"
+                          "NFC25, \"1,200\", , \n"
+                          "PVC50H, , , 0\n")
+    base = InMemoryCatalog(data_loader.get_price_master())
+    buyer = BuyerCatalog.from_csv(base, "SPACED", price_list)
+    assert buyer.get_item("NFC20").rate_pp == 16.5
+    assert buyer.get_item("NFC25").rate_pp == base.get_item("NFC25").rate_pp
+    assert buyer.get_item("PVC50H") is None
+    assert buyer.row_count == 2
+
+
+def test_buyer_mappers_are_loaded_lazily_and_evicted(tmp_path, monkeypatch):
+    """ Buyer mappers are created on first use, evicted once the row budget is exceeded, and reloaded when their CSV changes. """
+    (tmp_path / "BUYER_A.csv").write_text("sku_code,rate_inr,rate_alt_inr,available\nNFC20,16,,\nNFC25,22,,1\n")
+    (tmp_path / "BUYER_B.csv").write_text("sku_code,rate_inr,rate_alt_inr,available\nNFC20,17,,\nPVC50H,,,0\n")
+    base_mapper = SkuMapper(InMemoryCatalog(data_loader.get_price_master()))
+    registry = BuyerMapperRegistry(base_mapper, tmp_path, max_rows=3)
+
+    assert registry.get("NO_PRICE_LIST") is base_mapper
+    assert "NO_PRICE_LIST" in registry._mappers  # The negative lookup is cached too
+
+    buyer_a = registry.get("BUYER_A")
+    assert buyer_a is not base_mapper and registry.get("BUYER_A") is buyer_a
+    buyer_b = registry.get("BUYER_B")
+    assert buyer_b.get_item("PVC50H") is None
+    reloaded_a = registry.get("BUYER_A")
+    assert reloaded_a is not buyer_a and reloaded_a.get_item("NFC20").rate_pp == 16
+
+    monkeypatch.setattr(mapper, "BUYER_PRICE_LIST_RECHECK_SECONDS", 0)
+    (tmp_path / "BUYER_A.csv").write_text("sku_code,rate_inr,rate_alt_inr,available\nNFC20,15,,\n")
+    os.utime(tmp_path / "BUYER_A.csv", (time.time() + 10, time.time() + 10))
+    assert registry.get("BUYER_A").get_item("NFC20").rate_pp == 15
+
+    # A price list that cannot be loaded at all fails the same way until it changes, without being re-read
+    (tmp_path / "BROKEN.csv").write_text("sku,rate_inr\nNFC20,15\n")
+    with pytest.raises(ValueError):
+        registry.get("BROKEN")
+    monkeypatch.setattr(BuyerCatalog, "from_csv", classmethod(lambda *args: pytest.fail("re-read a broken price list")))
+    monkeypatch.setattr(mapper, "BUYER_PRICE_LIST_RECHECK_SECONDS", 30)
+    with pytest.raises(ValueError):
+        registry.get("BROKEN")
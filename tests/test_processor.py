@@ -0,0 +1,50 @@
+# tests/test_processor.py
+from PIL import Image
+from src.app import processor
+from src.app.processor import RfqOCRProcessor, TILE_HEIGHT_PX
+
+ocr = RfqOCRProcessor()
+
+def test_tiles_cover_page_and_owned_ranges_partition_it():
+    """ Crops must cover every row of the page, and each row must be owned by exactly one band. """
+    for height in list(range(1, 4000, 7)) + [2500, 2580, 2620, 12000]:
+        bounds = ocr._tile_bounds(height)
+        assert bounds[0][0] == 0 and bounds[-1][1] == height
+        assert bounds[0][2] == 0 and bounds[-1][3] == height
+        for (_, crop_bottom, _, own_bottom), (next_crop_top, _, next_own_top, _) in zip(bounds, bounds[1:]):
+            assert next_crop_top <= crop_bottom
+            assert own_bottom == next_own_top
+        for crop_top, crop_bottom, own_top, own_bottom in bounds:
+            assert crop_top <= own_top < own_bottom <= crop_bottom
+
+def test_normalize_image_downscales_to_target_dpi():
+    """ High-DPI scans are scaled to 300 DPI, scans at or below 300 DPI are kept, and without DPI only the short side is capped. """
+    high_dpi = Image.new('RGB', (2000, 3000)); high_dpi.info['dpi'] = (600, 600)
+    page = ocr.normalize_image(high_dpi)
+    assert page.mode == 'L' and page.size == (1000, 1500)
+
+    target_dpi = Image.new('RGB', (4960, 7016)); target_dpi.info['dpi'] = (300, 300)
+    assert ocr.normalize_image(target_dpi).size == (4960, 7016)
+
+    low_dpi = Image.new('RGB', (3000, 4000)); low_dpi.info['dpi'] = (150, 150)
+    assert ocr.normalize_image(low_dpi).size == (3000, 4000)
+
+    landscape_photo = Image.new('RGB', (4000, 3000))
+    assert ocr.normalize_image(landscape_photo).size == (3307, 2480)
+
+    # A tall receipt keeps its full height and is left to the band splitting
+    receipt = Image.new('RGB', (1000, 8000))
+    assert ocr.normalize_image(receipt).size == (1000, 8000)
+
+def test_normalize_image_passes_small_grayscale_through():
+    """ A grayscale page that is already small enough is returned without a copy. """
+    page = Image.new('L', (800, 1100))
+    assert ocr.normalize_image(page) is page
+
+def test_ocr_tile_keeps_only_words_in_owned_range(monkeypatch):
+    """ Words whose vertical center falls in a band's overlap with its neighbour are dropped. """
+    fake_data = {'text': ['top', 'kept', 'overlap', ''], 'conf': ['90', '80', '85', '-1'],
+                 'top': [0, 100, TILE_HEIGHT_PX - 5, 0], 'height': [20, 20, 30, 0]}
+    monkeypatch.setattr(processor.pytesseract, 'image_to_data', lambda *args, **kwargs: fake_data)
+    words = ocr._ocr_tile(Image.new('L', (10, 10)), offset_y=0, own_top=0, own_bottom=TILE_HEIGHT_PX)
+    assert words == [('top', 90), ('kept', 80)]